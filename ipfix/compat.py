@@ -3,6 +3,7 @@ try:
     from datetime import timezone
     import urllib.request as urlreq
     from functools import lru_cache
+    import queue
 
     # These will succeed in Python 2, but we won't get here due to
     # ImportError from the previous lines.
@@ -14,11 +15,21 @@ except ImportError:
     import pytz as timezone
     import urllib2 as urlreq
     from functools32 import lru_cache
+    import Queue as queue
 
     from itertools import izip, ifilter
     xrange = xrange
     reduce = reduce
 
+import struct as _struct
+if hasattr(_struct.Struct, 'iter_unpack'):
+    def iter_unpack(st, buf):
+        return st.iter_unpack(buf)
+else:
+    def iter_unpack(st, buf):
+        return (st.unpack_from(buf, offset)
+                for offset in xrange(0, len(buf), st.size))
+
 def _get_memoryview_buffer(bufsize):
     return memoryview(bytearray(bufsize))
 
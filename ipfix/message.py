@@ -117,7 +117,9 @@ default 65535) result in :exc:`EndOfMessage` being raised.
 
 Messages can be written to a stream using :meth:`MessageBuffer.write_message`,
 or dumped to a byte array for transmission using :meth:`MessageBuffer.to_bytes`.
-The message must be reset before starting to write again.
+:meth:`MessageBuffer.to_memoryview` avoids the copy, returning a view into the
+buffer that must be consumed before the buffer is reused. The message must be
+reset before starting to write again.
 
 >>> b = msg.to_bytes()
 >>> msg.begin_export()
@@ -187,17 +189,22 @@ Grüezi, Y'all
 from __future__ import unicode_literals
 from . import template, types, compat
 from .template import IpfixEncodeError, IpfixDecodeError
-from .compat import timezone, ifilter, reduce
+from .compat import xrange, queue
 
-import io
-import operator
+import itertools
 import struct
-from datetime import datetime
+import time
 from warnings import warn
 
 _sethdr_st = struct.Struct("!HH")
 _msghdr_st = struct.Struct("!HHLLL")
 
+# pre-bound header struct methods, to avoid attribute lookups per call
+_sethdr_pack_into = _sethdr_st.pack_into
+_sethdr_unpack_from = _sethdr_st.unpack_from
+_msghdr_pack_into = _msghdr_st.pack_into
+_msghdr_unpack_from = _msghdr_st.unpack_from
+
 class EndOfMessage(Exception):
     """
     Exception raised when a write operation on a Message
@@ -207,6 +214,26 @@ class EndOfMessage(Exception):
     def __init__(self, *args):
         super(self.__class__, self).__init__(args)
 
+# Set-at-once counterparts of record decode functions, used for data sets
+# described by templates without variable-length IEs
+_set_decode_fns = {
+    template.Template.decode_namedict_from:
+        template.Template.decode_namedict_set_from,
+    template.Template.decode_tuple_from:
+        template.Template.decode_tuple_set_from
+}
+
+def _recv_into_fully(sock, view):
+    # fill view from sock, returning the count of bytes read;
+    # short only if the connection was closed
+    count = 0
+    while count < len(view):
+        got = sock.recv_into(view[count:])
+        if not got:
+            break
+        count += got
+    return count
+
 def accept_all_templates(tmpl):
     return True
 
@@ -219,16 +246,23 @@ class MessageBuffer(object):
         """Create a new MessageBuffer instance."""
 
         self.mbuf = compat.get_buffer(bytearray(buf_sz))
+        self._own_mbuf = self.mbuf
         self.length = 0
         self.sequence = None
         self.export_epoch = None
         self.odid = 0
         self.streamid = 0
 
+        # templates and accepted template IDs, keyed by odid then tid
         self.templates = {}
-        self.accepted_tids = set()
+        self.accepted_tids = {}
         self.sequences = {}
 
+        # records counted for (odid, streamid) _seq_key since the counter
+        # was last added to self.sequences; see _flush_sequence()
+        self._seq_key = (self.odid, self.streamid)
+        self._seq_delta = 0
+
         self.setlist = []
 
         self.auto_export_time = True
@@ -238,6 +272,9 @@ class MessageBuffer(object):
 
         self.last_tuple_iterator_ielist = None
 
+        # illegal set IDs already warned about
+        self._warned_illegal_setids = set()
+
         self.mtu = 65535
 
         self.template_record_hook = None
@@ -280,14 +317,23 @@ class MessageBuffer(object):
         :param dt: export time to set, as a datetime
 
         """
-        if not dt:
-            dt = datetime.utcnow()
-        self.export_epoch = types._encode_sec(dt)
+        if dt:
+            self.export_epoch = types._encode_sec(dt)
+        else:
+            self.export_epoch = int(time.time())
         self.auto_export_time = False
 
     def _increment_sequence(self):
-        self.sequences.setdefault((self.odid, self.streamid), 0)
-        self.sequences[(self.odid, self.streamid)] += 1
+        self._seq_delta += 1
+
+    def _flush_sequence(self):
+        # add records counted since the last flush to self.sequences,
+        # and start counting for the current domain
+        if self._seq_delta:
+            self.sequences[self._seq_key] = \
+                    self.sequences.get(self._seq_key, 0) + self._seq_delta
+            self._seq_delta = 0
+        self._seq_key = (self.odid, self.streamid)
 
     def _scan_setlist(self):
         # We've read a message. Discard all export state.
@@ -295,40 +341,39 @@ class MessageBuffer(object):
         self.cursetid = None
         self.curtmpl = None
 
+        # Switch sequence counter to the domain of the message just read
+        self._flush_sequence()
+
         # Clear the setlist and start from the beginning of the body
         self.setlist = []
         offset = _msghdr_st.size
 
-        while (offset < self.length):
-            (setid, setlen) = _sethdr_st.unpack_from(self.mbuf, offset)
-            if offset + setlen > self.length:
+        # hoist lookups out of the scan loop. Set lengths are variable (and
+        # not necessarily even), so the walk cannot be vectorized; a bound
+        # unpack_from per set is cheaper than reading via a word array.
+        unpack_from = _sethdr_unpack_from
+        mbuf = self.mbuf
+        length = self.length
+        append = self.setlist.append
+
+        while (offset < length):
+            (setid, setlen) = unpack_from(mbuf, offset)
+            if offset + setlen > length:
                 raise IpfixDecodeError("Set too long for message")
-            self.setlist.append((offset, setid, setlen))
+            append((offset, setid, setlen))
             offset += setlen
 
-    def read_message(self, stream):
-        """Read a IPFIX message from a stream.
-
-        This populates message header fields and the internal setlist.
-        Call for each new message before iterating over records when reading
-        from a stream.
-
-        :param stream: stream to read from
-        :raises: IpfixDecodeError
-
-        """
-
-        # deframe and parse message header
-        msghdr = stream.read(_msghdr_st.size)
-        if (len(msghdr) == 0):
+    def _decode_msghdr(self, count):
+        # parse and verify the message header in the buffer,
+        # given the count of header bytes read into it
+        if count == 0:
             raise EOFError()
-        elif (len(msghdr) < _msghdr_st.size):
+        elif count < _msghdr_st.size:
             raise IpfixDecodeError("Short read in message header ("+
-                                       str(len(msghdr)) +")")
+                                       str(count) +")")
 
-        self.mbuf[0:_msghdr_st.size] = msghdr
         (version, self.length, self.export_epoch, self.sequence, self.odid) = \
-                _msghdr_st.unpack_from(self.mbuf, 0)
+                _msghdr_unpack_from(self.mbuf, 0)
 
         # verify version and length
         if version != 10:
@@ -339,14 +384,19 @@ class MessageBuffer(object):
             raise IpfixDecodeError("Illegal message length" +
                                        str(self.length))
 
-        # read the rest of the message into the buffer
-        msgbody = stream.read(self.length-_msghdr_st.size)
-        if len(msgbody) < self.length - _msghdr_st.size:
+        if self.length > len(self.mbuf):
+            raise IpfixDecodeError("Message length "+str(self.length)+
+                                   " exceeds buffer size "+
+                                   str(len(self.mbuf)))
+
+    def _decode_msgbody(self, count):
+        # verify the message body in the buffer is complete,
+        # given the count of body bytes read into it, and deframe it
+        if count < self.length - _msghdr_st.size:
             raise IpfixDecodeError("Short read in message body (got "+
-                                   str(len(msgbody))+", expected "+
+                                   str(count)+", expected "+
                                    str(self.length - _msghdr_st.size)+")")
-        self.mbuf[_msghdr_st.size:self.length] = msgbody
-        
+
         # call the message header hook
         if self.message_header_hook:
             self.message_header_hook(self)
@@ -354,20 +404,94 @@ class MessageBuffer(object):
         # populate setlist
         self._scan_setlist()
 
+    def read_message(self, stream):
+        """Read a IPFIX message from a stream.
+
+        This populates message header fields and the internal setlist.
+        Call for each new message before iterating over records when reading
+        from a stream.
+
+        :param stream: stream to read from
+        :raises: IpfixDecodeError
+
+        """
+        self.mbuf = self._own_mbuf
+
+        # deframe and parse message header
+        msghdr = stream.read(_msghdr_st.size)
+        self.mbuf[0:len(msghdr)] = msghdr
+        self._decode_msghdr(len(msghdr))
+
+        # read the rest of the message into the buffer
+        msgbody = stream.read(self.length-_msghdr_st.size)
+        self.mbuf[_msghdr_st.size:_msghdr_st.size+len(msgbody)] = msgbody
+        self._decode_msgbody(len(msgbody))
+
+    def read_message_into(self, sock):
+        """Read an IPFIX message from a socket directly into the buffer.
+
+        Like :meth:`read_message`, but uses the socket's recv_into() to avoid
+        allocating and copying an intermediate bytes object per message.
+        Use :meth:`read_message` for file-like streams.
+
+        :param sock: stream socket to read from
+        :raises: IpfixDecodeError
+
+        """
+        self.mbuf = self._own_mbuf
+
+        # deframe and parse message header
+        self._decode_msghdr(
+                _recv_into_fully(sock, self.mbuf[0:_msghdr_st.size]))
+
+        # read the rest of the message into the buffer
+        self._decode_msgbody(
+                _recv_into_fully(sock, self.mbuf[_msghdr_st.size:self.length]))
+
     def from_bytes(self, str_):
         """
         Read an IPFIX message from a byte array.
 
         This populates message header fields and the internal setlist.
         Call for each new message before iterating over records when reading
-        from a byte array.
+        from a byte array. The message is copied once into the buffer.
 
         :param bytes: a byte array containing a complete IPFIX message.
         :raises: IpfixDecodeError
 
         """
-        return self.read_message(io.BytesIO(str_))
-            
+        self.mbuf = self._own_mbuf
+
+        # slice without copying
+        src = memoryview(str_)
+
+        # deframe and parse message header
+        count = min(len(src), _msghdr_st.size)
+        self.mbuf[0:count] = src[0:count]
+        self._decode_msghdr(count)
+
+        # copy the rest of the message into the buffer
+        msgbody = src[_msghdr_st.size:self.length]
+        self.mbuf[_msghdr_st.size:_msghdr_st.size+len(msgbody)] = msgbody
+        self._decode_msgbody(len(msgbody))
+
+    def from_memoryview(self, mv):
+        """
+        Read an IPFIX message from a memoryview (or other buffer), in place.
+
+        Like :meth:`from_bytes`, but does not copy the message: it is decoded
+        directly from the given memory, which must not change until the
+        caller is done iterating over its records. The MessageBuffer returns
+        to its own buffer on the next read or :meth:`begin_export`.
+
+        :param mv: a memoryview containing a complete IPFIX message.
+        :raises: IpfixDecodeError
+
+        """
+        self.mbuf = memoryview(mv)
+        self._decode_msghdr(min(len(self.mbuf), _msghdr_st.size))
+        self._decode_msgbody(len(self.mbuf[_msghdr_st.size:self.length]))
+
     def record_iterator(self, 
                         decode_fn=template.Template.decode_namedict_from, 
                         tmplaccept_fn=accept_all_templates, 
@@ -393,44 +517,75 @@ class MessageBuffer(object):
         :returns: an iterator over records decoded by decode_fn.
 
         """
+        # hoist lookups out of the set and record loops
+        sethdr_size = _sethdr_st.size
+        set_decode_fn = _set_decode_fns.get(decode_fn)
+        mbuf = self.mbuf
+        templates = self.templates.setdefault(self.odid, {})
+        accepted_tids = self.accepted_tids.setdefault(self.odid, set())
+        increment_sequence = self._increment_sequence
+
         for (offset, setid, setlen) in self.setlist:
             setend = offset + setlen
-            offset += _sethdr_st.size # skip set header in decode
+            offset += sethdr_size # skip set header in decode
             if setid == template.TEMPLATE_SET_ID or\
                setid == template.OPTIONS_SET_ID:
-                while offset < setend:
-                    (tmpl, offset) = template.decode_template_from(
-                                              self.mbuf, offset, setid)
-                    # FIXME handle withdrawal
-                    self.templates[(self.odid, tmpl.tid)] = tmpl
-                    if tmplaccept_fn(tmpl):
-                        self.accepted_tids.add((self.odid, tmpl.tid))
-                    else:
-                        self.accepted_tids.discard((self.odid, tmpl.tid))
-
-                    if self.template_record_hook:
-                        self.template_record_hook(self, tmpl)
-
+                self._decode_template_set(offset, setend, setid, tmplaccept_fn)
             elif setid < 256:
-                warn("skipping illegal set id "+str(setid))
+                if setid not in self._warned_illegal_setids:
+                    self._warned_illegal_setids.add(setid)
+                    warn("skipping illegal set id "+str(setid))
             else:
                 try:
-                    tmpl = self.templates[(self.odid, setid)]
-                    if (self.odid, setid) in self.accepted_tids:
-                        while offset + tmpl.minlength <= setend:
-                            (rec, offset) = decode_fn(tmpl, self.mbuf, offset,
-                                                      recinf = recinf)
-                            yield rec
-                            self._increment_sequence()
-                    elif self.ignored_data_set_hook:
-                        # not in accepted tids - ignored data set
-                        self.ignored_data_set_hook(self, tmpl,
-                                     self.mbuf[offset-_sethdr_st.size:setend])
-                except KeyError as e:
+                    tmpl = templates[setid]
+                except KeyError:
+                    # unknown data set
                     if self.unknown_data_set_hook:
-                        # KeyError on template lookup - unknown data set
                         self.unknown_data_set_hook(self,
-                                     self.mbuf[offset-_sethdr_st.size:setend])
+                                     mbuf[offset-sethdr_size:setend])
+                    continue
+
+                if setid not in accepted_tids:
+                    # ignored data set
+                    if self.ignored_data_set_hook:
+                        self.ignored_data_set_hook(self, tmpl,
+                                     mbuf[offset-sethdr_size:setend])
+                elif set_decode_fn and tmpl.varlenslice is None:
+                    # fixed-length records, unpack the whole set at once
+                    for rec in set_decode_fn(tmpl, mbuf, offset, setend,
+                                             recinf = recinf):
+                        yield rec
+                        increment_sequence()
+                else:
+                    minlength = tmpl.minlength
+                    while offset + minlength <= setend:
+                        (rec, offset) = decode_fn(tmpl, mbuf, offset,
+                                                  recinf = recinf)
+                        yield rec
+                        increment_sequence()
+
+        # message exhausted, store sequence counter
+        self._flush_sequence()
+
+    def _decode_template_set(self, offset, setend, setid, tmplaccept_fn):
+        # hoist lookups out of the template record loop
+        decode_template_from = template.decode_template_from
+        mbuf = self.mbuf
+        templates = self.templates.setdefault(self.odid, {})
+        accepted_tids = self.accepted_tids.setdefault(self.odid, set())
+        template_record_hook = self.template_record_hook
+
+        while offset < setend:
+            (tmpl, offset) = decode_template_from(mbuf, offset, setid)
+            # FIXME handle withdrawal
+            templates[tmpl.tid] = tmpl
+            if tmplaccept_fn(tmpl):
+                accepted_tids.add(tmpl.tid)
+            else:
+                accepted_tids.discard(tmpl.tid)
+
+            if template_record_hook:
+                template_record_hook(self, tmpl)
 
     def namedict_iterator(self):
         """
@@ -445,11 +600,12 @@ class MessageBuffer(object):
                 decode_fn = template.Template.decode_namedict_from)
 
     def _recache_accepted_tids(self, tmplaccept_fn):
-        for tid in self.active_template_ids():
-            if tmplaccept_fn(self.templates[(self.odid, tid)]):
-                self.accepted_tids.add((self.odid, tid))
+        accepted_tids = self.accepted_tids.setdefault(self.odid, set())
+        for (tid, tmpl) in self.templates.get(self.odid, {}).items():
+            if tmplaccept_fn(tmpl):
+                accepted_tids.add(tid)
             else:
-                self.accepted_tids.discard((self.odid, tid))
+                accepted_tids.discard(tid)
 
     def tuple_iterator(self, ielist):
         """
@@ -462,9 +618,10 @@ class MessageBuffer(object):
 
         """
 
-        tmplaccept_fn = lambda tmpl: \
-                reduce(operator.__and__,
-                                 (ie in tmpl.ies for ie in ielist))
+        ielist_keys = tuple((ie.pen, ie.num) for ie in ielist)
+        def tmplaccept_fn(tmpl):
+            ie_keys = tmpl._ie_keys
+            return all(key in ie_keys for key in ielist_keys)
 
         if ((not self.last_tuple_iterator_ielist) or
             (ielist is not self.last_tuple_iterator_ielist)):
@@ -476,35 +633,57 @@ class MessageBuffer(object):
                 tmplaccept_fn = tmplaccept_fn,
                 recinf = ielist)
 
-    def to_bytes(self):
+    def to_memoryview(self):
         """
-        Convert this MessageBuffer to a byte array, suitable for writing
-        to a binary file, socket, or datagram. Finalizes the message by
-        rewriting the message header with current length, and export time.
+        Finalize this MessageBuffer and return a view of the message in the
+        underlying buffer, without copying. Suitable for passing directly to
+        socket.sendall() or a binary stream's write(). Finalizes the message
+        by rewriting the message header with current length, and export time.
 
-        :returns: message as a byte array
+        The view shares memory with this MessageBuffer: it must be consumed
+        before the next call to :meth:`begin_export`, :meth:`read_message` or
+        :meth:`from_bytes`. Use :meth:`to_bytes` to get a copy instead.
+
+        :returns: message as a memoryview
 
         """
 
         # Close final set
-        self._export_close_set()
+        if self.cursetid:
+            _sethdr_pack_into(self.mbuf, self.cursetoff,
+                              self.cursetid, self.length - self.cursetoff)
+            self.cursetid = None
 
         # Update export time if necessary
         if self.auto_export_time:
-            dt = datetime.utcnow().replace(tzinfo=timezone.utc)
-            self.export_epoch = int(compat.datetime_to_timestamp(dt))
+            self.export_epoch = int(time.time())
+
+        # Store sequence counter
+        self._flush_sequence()
 
         # Update message header in buffer
-        _msghdr_st.pack_into(self.mbuf, 0, 10, self.length, 
+        _msghdr_pack_into(self.mbuf, 0, 10, self.length, 
                              self.export_epoch, self.sequence, self.odid)
         
-        return self.mbuf[0:self.length].tobytes()
+        return self.mbuf[0:self.length]
+
+    def to_bytes(self):
+        """
+        Convert this MessageBuffer to a byte array, suitable for writing
+        to a binary file, socket, or datagram. Finalizes the message by
+        rewriting the message header with current length, and export time.
+
+        :returns: message as a byte array
+
+        """
+        return self.to_memoryview().tobytes()
 
     def write_message(self, stream):
         """
-        Convenience method to write a message to a stream; see :meth:`to_bytes`.
+        Convenience method to write a message to a stream; see
+        :meth:`to_memoryview`.
         """
-        stream.write(self.to_bytes())
+        stream.write(self.to_memoryview())
 
     def add_template(self, tmpl, export=True):
         """
@@ -516,7 +695,8 @@ class MessageBuffer(object):
                        after adding it.
         :raises: EndOfMessage
         """
-        self.templates[(self.odid, tmpl.tid)] = tmpl
+        self.templates.setdefault(self.odid, {})[tmpl.tid] = tmpl
+        tmpl.compile_encoders()
 
         if export:
             self.export_template(tmpl.tid)
@@ -534,8 +714,9 @@ class MessageBuffer(object):
         :raises: EndOfMessage
 
         """
-        setid = self.templates[self.odid, tid].native_setid()
-        del(self.templates[self.odid, tid])
+        templates = self.templates[self.odid]
+        setid = templates[tid].native_setid()
+        del(templates[tid])
         if export:
             self.export_template_withdrawal(setid, tid)
 
@@ -548,8 +729,8 @@ class MessageBuffer(object):
         :returns: a template ID iterator
 
         """
-        for tk in ifilter(lambda k: k[0] == self.odid, self.templates):
-            yield tk[1]
+        for tid in self.templates.get(self.odid, {}):
+            yield tid
 
     def template_for_id(self, tid):
         """
@@ -560,7 +741,7 @@ class MessageBuffer(object):
         :raises: KeyError
 
         """
-        return self.templates[(self.odid, tid)]
+        return self.templates[self.odid][tid]
 
     def begin_export(self, odid=None):
         """
@@ -577,19 +758,19 @@ class MessageBuffer(object):
         """
         # We're exporting. Clear setlist from any previously read message.
         self.setlist = []
-
-        # Set sequence number
-        self.sequences.setdefault((self.odid, self.streamid), 0) # FIXME why do we need this?
-        self.sequence = self.sequences[(self.odid, self.streamid)]
+        self.mbuf = self._own_mbuf
 
         # set new domain if necessary
         if odid:
             self.odid = odid
 
-        # reset message and zero header
+        # Set sequence number for the domain
+        self._flush_sequence()
+        self.sequence = self.sequences.setdefault(self._seq_key, 0)
+
+        # reset message; the header is written in full by to_memoryview()
         self.length = _msghdr_st.size
         self.cursetoff = self.length
-        self.mbuf[0:_msghdr_st.size] = bytearray([0] * _msghdr_st.size)
 
         if self.mtu <= self.length:
             raise IpfixEncodeError("MTU too small: "+str(self.mtu))
@@ -611,16 +792,19 @@ class MessageBuffer(object):
 
         """
         # close current set if any
-        self._export_close_set()
+        if self.cursetid:
+            _sethdr_pack_into(self.mbuf, self.cursetoff,
+                              self.cursetid, self.length - self.cursetoff)
+            self.cursetid = None
 
         if setid >= 256:
             # make sure we have a template for the set
-            if not ((self.odid, setid) in self.templates):
+            tmpl = self.templates.get(self.odid, {}).get(setid)
+            if tmpl is None:
                 raise IpfixEncodeError("can't start set without template id " +
                                        str(setid))
 
             # make sure we have room to export at least one record
-            tmpl = self.templates[(self.odid, setid)]
             if self.length + _sethdr_st.size + tmpl.minlength > self.mtu:
                 raise EndOfMessage()
         else:
@@ -631,7 +815,7 @@ class MessageBuffer(object):
         self.cursetoff = self.length
         self.cursetid = setid
         self.curtmpl = tmpl
-        _sethdr_st.pack_into(self.mbuf, self.length, setid, 0)
+        _sethdr_pack_into(self.mbuf, self.length, setid, 0)
         self.length += _sethdr_st.size
 
     def export_ensure_set(self, setid):
@@ -662,9 +846,11 @@ class MessageBuffer(object):
             return True
 
     def _export_close_set(self):
+        # slow-path convenience for external callers; to_memoryview() and
+        # export_new_set() inline this to save a call per set
         if self.cursetid:
-            _sethdr_st.pack_into(self.mbuf, self.cursetoff,
-                                 self.cursetid, self.length - self.cursetoff)
+            _sethdr_pack_into(self.mbuf, self.cursetoff,
+                              self.cursetid, self.length - self.cursetoff)
             self.cursetid = None
 
     def export_template(self, tid):
@@ -677,7 +863,7 @@ class MessageBuffer(object):
 
         """
 
-        tmpl = self.templates[(self.odid, tid)]
+        tmpl = self.templates[self.odid][tid]
 
         self.export_ensure_set(tmpl.native_setid())
 
@@ -716,17 +902,26 @@ class MessageBuffer(object):
 
         """
         savelength = self.length
+        fixed_length = self.curtmpl.fixed_length
 
-        try:
-            self.length = encode_fn(self.curtmpl, self.mbuf, self.length, rec, recinf)
-        except struct.error: # out of bounds on the underlying mbuf
-            self.length = savelength
-            raise EndOfMessage()
+        if fixed_length is not None:
+            # record length known in advance; check for mtu and buffer
+            # overrun first
+            end = savelength + fixed_length
+            if end > self.mtu or end > len(self.mbuf):
+                raise EndOfMessage()
+            self.length = encode_fn(self.curtmpl, self.mbuf, savelength, rec, recinf)
+        else:
+            try:
+                self.length = encode_fn(self.curtmpl, self.mbuf, savelength, rec, recinf)
+            except struct.error: # out of bounds on the underlying mbuf
+                self.length = savelength
+                raise EndOfMessage()
 
-        # check for mtu overrun
-        if self.length > self.mtu:
-            self.length = savelength
-            raise EndOfMessage()
+            # check for mtu overrun
+            if self.length > self.mtu:
+                self.length = savelength
+                raise EndOfMessage()
 
         self._increment_sequence()
 
@@ -753,3 +948,141 @@ class MessageBuffer(object):
 
         """
         self.export_record(rec, template.Template.encode_tuple_to)
+
+    def export_tuple_raw(self, rec):
+        """
+        Export a record to the message, using the template for the current Set
+        ID. The record is a tuple of raw values in template order, packed
+        without conversion from Python types; see
+        :meth:`ipfix.template.Template.encode_tuple_raw_to`. Faster than
+        :meth:`export_tuple` when the caller already has, or can cache,
+        values in wire form, e.g. IPv4 addresses as integers and timestamps
+        as epoch milliseconds.
+
+        :param rec: the record to export, as a tuple of raw values in
+                    template order.
+        :raises: EndOfMessage
+
+        """
+        self.export_record(rec, template.Template.encode_tuple_raw_to)
+
+    def export_tuples(self, recs):
+        """
+        Export a sequence of records to the message, using the template for
+        the current Set ID. Each record is a tuple of values in template order.
+        Equivalent to calling :meth:`export_tuple` for each record, but avoids
+        most of the per-record call overhead; use for bulk export.
+
+        If the message fills up, the records exported so far are kept, and
+        :exc:`EndOfMessage` is raised with its remainder attribute set to an
+        iterator over the records not exported, starting with the one which
+        did not fit.
+
+        :param recs: an iterable of records to export, as tuples in
+                     template order.
+        :raises: EndOfMessage
+
+        """
+        encode_tuple_to = self.curtmpl.encode_tuple_to
+        fixed_length = self.curtmpl.fixed_length
+        mbuf = self.mbuf
+        limit = min(self.mtu, len(mbuf))
+        length = self.length
+        count = 0
+        overrun = False
+
+        recs = iter(recs)
+        try:
+            if fixed_length is not None:
+                # record length known in advance; check for overrun first,
+                # so struct.error here is a bad value, and propagates
+                for rec in recs:
+                    if length + fixed_length > limit:
+                        overrun = True
+                        break
+                    length = encode_tuple_to(mbuf, length, rec)
+                    count += 1
+            else:
+                try:
+                    for rec in recs:
+                        offset = encode_tuple_to(mbuf, length, rec)
+                        if offset > limit:
+                            overrun = True
+                            break
+                        length = offset
+                        count += 1
+                except struct.error:
+                    # out of bounds on the underlying mbuf, or a bad value;
+                    # if the fixed part fits, tell them apart by encoding
+                    # the record into a scratch buffer, raising on bad values
+                    if length + self.curtmpl.packplan.st.size <= len(mbuf):
+                        encode_tuple_to(bytearray(len(mbuf)), 0, rec)
+                    overrun = True
+        finally:
+            self.length = length
+            self._seq_delta += count
+
+        if overrun:
+            eom = EndOfMessage()
+            eom.remainder = itertools.chain((rec,), recs)
+            raise eom
+
+class MessageBufferPool(object):
+    """
+    A pool of preallocated MessageBuffers.
+
+    Lets an exporter hand a finished message to another thread for output
+    (e.g. with socket.sendall() on :meth:`MessageBuffer.to_memoryview`,
+    which releases the GIL while sending) and go on encoding into another
+    buffer, without allocating a new buffer or copying the message.
+    Buffers are handed out most recently released first, for cache locality.
+
+    The MessageBuffers in a pool share templates and sequence numbers, so
+    they export a single message stream: templates added to one buffer are
+    known to the others, and each message continues the sequence of the
+    message finished before it. Finish each message with
+    :meth:`MessageBuffer.to_memoryview` (or :meth:`MessageBuffer.to_bytes`)
+    before calling :meth:`MessageBuffer.begin_export` on the next buffer.
+
+    """
+    def __init__(self, size, mtu=65535):
+        """
+        Create a new MessageBufferPool.
+
+        :param size: number of MessageBuffers to preallocate
+        :param mtu: maximum message size for each MessageBuffer
+
+        """
+        self.templates = {}
+        self.sequences = {}
+        self._free = queue.LifoQueue()
+        for i in xrange(size):
+            msg = MessageBuffer()
+            msg.mtu = mtu
+            msg.templates = self.templates
+            msg.sequences = self.sequences
+            self._free.put(msg)
+
+    def acquire(self, block=True, timeout=None):
+        """
+        Take a MessageBuffer from the pool, waiting for one to be released
+        if none is free.
+
+        :param block: if False, don't wait for a MessageBuffer
+        :param timeout: maximum time in seconds to wait, or None to wait
+                        indefinitely
+        :returns: a MessageBuffer
+        :raises: queue.Empty if no MessageBuffer became available
+
+        """
+        return self._free.get(block, timeout)
+
+    def release(self, msg):
+        """
+        Return a MessageBuffer to the pool. Any memoryview obtained from it
+        with :meth:`MessageBuffer.to_memoryview` must have been consumed.
+
+        :param msg: the MessageBuffer to return, from :meth:`acquire`
+
+        """
+        self._free.put(msg)
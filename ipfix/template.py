@@ -29,7 +29,7 @@ See :mod:`ipfix.message` for examples.
 
 """
 from . import ie, types, compat
-from .compat import izip, xrange, lru_cache
+from .compat import izip, xrange, lru_cache, iter_unpack
 
 import struct
 
@@ -59,6 +59,13 @@ _otmplhdr_st = struct.Struct("!HHH")
 _iespec_st = struct.Struct("!HH")
 _iepen_st = struct.Struct("!L")
 
+def _raw_stel(ietype):
+    # struct element for a raw value of a fixed-length type;
+    # IPv4 addresses are packed from integers
+    if ietype.name == "ipv4Address":
+        return "L"
+    return ietype.stel
+
 class TemplatePackingPlan(object):
     """
     Plan to pack/unpack a specific set of indices for a template.
@@ -103,12 +110,20 @@ class Template(object):
 
         self.tid = tid
         self.minlength = 0
+        self.fixed_length = 0
         self.enclength = 0
         self.scopecount = 0
         self.varlenslice = None
         self.packplan = None
+        self._tuple_encoder = None
+        self._namedict_encoder = None
+        self._raw_st = None
+        self._raw_tail_sts = None
 
         self.ies = []
+        # (pen, num) of each IE, matching InformationElement equality,
+        # which ignores length
+        self._ie_keys = set()
         if iterable:
             if not isinstance(iterable, ie.InformationElementList):
                 iterable = ie.InformationElementList(iterable)
@@ -134,13 +149,21 @@ class Template(object):
     def append(self, ie):
         """Append an IE to this Template"""
         self.ies.append(ie)
+        self._tuple_encoder = None
+        self._namedict_encoder = None
+        self._raw_st = None
+        self._raw_tail_sts = None
+        self._ie_keys.add((ie.pen, ie.num))
 
         if ie.length == types.VARLEN:
             self.minlength += 1
+            self.fixed_length = None
             if self.varlenslice is None:
                 self.varlenslice = len(self.ies) - 1
         else:
             self.minlength += ie.length
+            if self.fixed_length is not None:
+                self.fixed_length += ie.length
 
         self.enclength += _iespec_st.size
         if (ie.pen):
@@ -203,6 +226,25 @@ class Template(object):
 
         return (vals, offset)
 
+    def decode_set_from(self, buf, offset, setend, packplan = None):
+        """
+        Decodes all records in a set into lists containing values in template
+        order, unpacking the whole set at once. Only valid for templates
+        without variable-length IEs.
+
+        """
+        if not packplan:
+            packplan = self.packplan
+
+        st = packplan.st
+        if not st.size:
+            return
+
+        valdec = packplan.valdec
+        end = offset + ((setend - offset) // st.size) * st.size
+        for fixvals in iter_unpack(st, buf[offset:end]):
+            yield [f(v) for f, v in izip(valdec, fixvals)]
+
     def decode_namedict_from(self, buf, offset, recinf = None):
         """Decodes a record from a buffer into a dict keyed by IE name."""
         (vals, offset) = self.decode_from(buf, offset)
@@ -226,6 +268,32 @@ class Template(object):
         # re-sort values in same order as packplan indices
         return (outvals, offset)
 
+    def decode_namedict_set_from(self, buf, offset, setend, recinf = None):
+        """
+        Decodes all records in a set into dicts keyed by IE name.
+        Only valid for templates without variable-length IEs.
+
+        """
+        names = [ie.name for ie in self.ies]
+        for vals in self.decode_set_from(buf, offset, setend):
+            yield dict(izip(names, vals))
+
+    def decode_tuple_set_from(self, buf, offset, setend, recinf = None):
+        """
+        Decodes all records in a set into tuples, ordered as the IEs in
+        the InformationElementList given as recinf.
+        Only valid for templates without variable-length IEs.
+
+        """
+        if recinf:
+            packplan = self.packplan_for_ielist(recinf)
+        else:
+            packplan = self.packplan
+
+        ranks = packplan.ranks
+        for vals in self.decode_set_from(buf, offset, setend, packplan):
+            yield tuple(v for i,v in sorted(izip(ranks, vals)))
+
     def encode_to(self, buf, offset, vals, packplan = None):
         """Encodes a record from a tuple containing values in template order"""
 
@@ -242,10 +310,16 @@ class Template(object):
         if not self.varlenslice:
             return offset
 
+        return self._encode_varlen_to(buf, offset, vals[self.varlenslice:],
+                                      packplan)
+
+    def _encode_varlen_to(self, buf, offset, vals, packplan):
+        # encode values for the IEs from the first variable-length IE on
+
         # direct iteration over remaining IEs
         for i, ie, val in izip(xrange(self.varlenslice, self.count()),
                               self.ies[self.varlenslice:],
-                              vals[self.varlenslice:]):
+                              vals):
             if i in packplan.indices:
                 #print("    encoding "+str(ie))
                 if ie.length == types.VARLEN:
@@ -262,6 +336,8 @@ class Template(object):
 
     def encode_namedict_to(self, buf, offset, rec, recinf = None):
         """Encodes a record from a dict containing values keyed by IE name"""
+        if self._namedict_encoder:
+            return self._namedict_encoder(buf, offset, rec)
         return self.encode_to(buf, offset, [rec[ie.name] for ie in self.ies])
 
     def encode_tuple_to(self, buf, offset, rec, recinf = None):
@@ -270,8 +346,106 @@ class Template(object):
         in the template.
 
         """
+        if self._tuple_encoder:
+            return self._tuple_encoder(buf, offset, rec)
         return self.encode_to(buf, offset, rec)
 
+    def encode_tuple_raw_to(self, buf, offset, rec, recinf = None):
+        """
+        Encodes a record from a tuple containing raw values ordered as the IEs
+        in the template. Raw values are packed as given, without conversion
+        from Python types: integers for numeric types, integers on the wire
+        scale for timestamps (seconds, milliseconds, or NTP format), integers
+        for IPv4 addresses, and bytes for octet arrays, UTF-8 strings, and
+        IPv6 and MAC addresses.
+
+        """
+        if self._raw_st is None:
+            self._compile_raw_encoder()
+
+        if self.varlenslice is None:
+            self._raw_st.pack_into(buf, offset, *rec)
+            return offset + self._raw_st.size
+
+        self._raw_st.pack_into(buf, offset, *rec[:self.varlenslice])
+        offset += self._raw_st.size
+
+        # direct iteration over remaining IEs
+        for st, val in izip(self._raw_tail_sts, rec[self.varlenslice:]):
+            if st:
+                st.pack_into(buf, offset, val)
+                offset += st.size
+            else:
+                offset = types.encode_varlen(buf, offset, len(val))
+                buf[offset:offset+len(val)] = val
+                offset += len(val)
+
+        return offset
+
+    def _compile_raw_encoder(self):
+        # structs for raw encoding of the fixed-length prefix, and of each
+        # fixed-length IE after it (None for variable-length IEs)
+        fixlen = self.fixlen_count()
+        self._raw_st = struct.Struct("!" + "".join(
+                            _raw_stel(e.type) for e in self.ies[:fixlen]))
+        self._raw_tail_sts = [None if e.length == types.VARLEN
+                              else struct.Struct("!" + _raw_stel(e.type))
+                              for e in self.ies[fixlen:]]
+
+    def compile_encoders(self):
+        """
+        Generate record encoders specialized for this template, used by
+        :meth:`encode_tuple_to` and :meth:`encode_namedict_to`. These pack all
+        fixed-length values in a single struct call, without per-IE dispatch.
+        Called after finalize(); :meth:`ipfix.message.MessageBuffer.add_template`
+        does this for templates used for export.
+
+        """
+        packplan = self.packplan
+        if not packplan or self.varlenslice == 0:
+            # nothing to pack in one call
+            return
+
+        ns = { "pack_into": packplan.st.pack_into,
+               "encode_varlen_to": self._encode_varlen_to,
+               "packplan": packplan }
+
+        tuple_vals = []
+        namedict_vals = []
+        for i, e in enumerate(self.ies):
+            ns["k%u" % i] = e.name
+            if i < len(packplan.valenc) and \
+               packplan.valenc[i] is not types._identity:
+                ns["enc%u" % i] = packplan.valenc[i]
+                tuple_vals.append("enc%u(rec[%u])" % (i, i))
+                namedict_vals.append("enc%u(rec[k%u])" % (i, i))
+            else:
+                tuple_vals.append("rec[%u]" % i)
+                namedict_vals.append("rec[k%u]" % i)
+
+        fixlen = self.fixlen_count()
+        if self.varlenslice is None:
+            tuple_ret = namedict_ret = "offset + %u" % packplan.st.size
+        else:
+            tuple_ret = "encode_varlen_to(buf, offset + %u, rec[%u:], packplan)" % \
+                        (packplan.st.size, fixlen)
+            namedict_ret = "encode_varlen_to(buf, offset + %u, (%s,), packplan)" % \
+                           (packplan.st.size, ", ".join(namedict_vals[fixlen:]))
+
+        src = ("def tuple_encoder(buf, offset, rec):\n"
+               "    pack_into(buf, offset, %s)\n"
+               "    return %s\n"
+               "def namedict_encoder(buf, offset, rec):\n"
+               "    pack_into(buf, offset, %s)\n"
+               "    return %s\n") % \
+              (", ".join(tuple_vals[:fixlen]), tuple_ret,
+               ", ".join(namedict_vals[:fixlen]), namedict_ret)
+        exec(compile(src, "<encoders for template "+str(self.tid)+">", "exec"), ns)
+
+        self._tuple_encoder = ns["tuple_encoder"]
+        self._namedict_encoder = ns["namedict_encoder"]
+        self._compile_raw_encoder()
+
     def encode_template_to(self, buf, offset, setid):
         """
         Encodes the template to a buffer.
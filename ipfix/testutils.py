@@ -20,13 +20,15 @@
 #
 
 from __future__ import unicode_literals, division
-from . import ie, template, message, compat
+from . import ie, template, message, compat, types
 from .template import IpfixEncodeError, IpfixDecodeError
 from .compat import xrange
 from datetime import datetime, timedelta
 from ipaddress import ip_address
 import base64
 import io
+import socket
+import struct
 
 _stored_test_message = base64.b64decode(b'AAoPe0mfAfkAAAAAAAAgcAACACABAQAFAAgABACYAAj//v//AACK7gABAAQAAgAIAQEPS38AAAAAAAEfkPtEAARhbGZhAAAAAAAAAAAAAAAAfwAAAQAAAR+Q+0QBBWJyYXZvAAAAAQAAAAAAAAABfwAAAgAAAR+Q+0QCB2NoYXJsaWUAAAACAAAAAAAAAAJ/AAADAAABH5D7RAMFZGVsdGEAAAADAAAAAAAAAAN/AAAEAAABH5D7RAQEZWNobwAAAAQAAAAAAAAABH8AAAUAAAEfkPtEBQdmb3h0cm90AAAABQAAAAAAAAAFfwAABgAAAR+Q+0QGB2dyw7xlemkAAAAGAAAAAAAAAAZ/AAAHAAABH5D7RAcEYWxmYQAAAAcAAAAAAAAAB38AAAgAAAEfkPtECAVicmF2bwAAAAgAAAAAAAAACH8AAAkAAAEfkPtECQdjaGFybGllAAAACQAAAAAAAAAJfwAACgAAAR+Q+0QKBWRlbHRhAAAACgAAAAAAAAAKfwAACwAAAR+Q+0QLBGVjaG8AAAALAAAAAAAAAAt/AAAMAAABH5D7RAwHZm94dHJvdAAAAAwAAAAAAAAADH8AAA0AAAEfkPtEDQdncsO8ZXppAAAADQAAAAAAAAANfwAADgAAAR+Q+0QOBGFsZmEAAAAOAAAAAAAAAA5/AAAPAAABH5D7RA8FYnJhdm8AAAAPAAAAAAAAAA9/AAAQAAABH5D7RBAHY2hhcmxpZQAAABAAAAAAAAAAEH8AABEAAAEfkPtEEQVkZWx0YQAAABEAAAAAAAAAEX8AABIAAAEfkPtEEgRlY2hvAAAAEgAAAAAAAAASfwAAEwAAAR+Q+0QTB2ZveHRyb3QAAAATAAAAAAAAABN/AAAUAAABH5D7RBQHZ3LDvGV6aQAAABQAAAAAAAAAFH8AABUAAAEfkPtEFQRhbGZhAAAAFQAAAAAAAAAVfwAAFgAAAR+Q+0QWBWJyYXZvAAAAFgAAAAAAAAAWfwAAFwAAAR+Q+0QXB2NoYXJsaWUAAAAXAAAAAAAAABd/AAAYAAABH5D7RBgFZGVsdGEAAAAYAAAAAAAAABh/AAAZAAABH5D7RBkEZWNobwAAABkAAAAAAAAAGX8AABoAAAEfkPtEGgdmb3h0cm90AAAAGgAAAAAAAAAafwAAGwAAAR+Q+0QbB2dyw7xlemkAAAAbAAAAAAAAAAB/AAAcAAABH5D7RBwEYWxmYQAAABwAAAAAAAAAAX8AAB0AAAEfkPtEHQVicmF2bwAAAB0AAAAAAAAAAn8AAB4AAAEfkPtEHgdjaGFybGllAAAAHgAAAAAAAAADfwAAHwAAAR+Q+0QfBWRlbHRhAAAAHwAAAAAAAAAEfwAAIAAAAR+Q+0QgBGVjaG8AAAAgAAAAAAAAAAV/AAAhAAABH5D7RCEHZm94dHJvdAAAAAAAAAAAAAAABn8AACIAAAEfkPtEIgdncsO8ZXppAAAAAQAAAAAAAAAHfwAAIwAAAR+Q+0QjBGFsZmEAAAACAAAAAAAAAAh/AAAkAAABH5D7RCQFYnJhdm8AAAADAAAAAAAAAAl/AAAlAAABH5D7RCUHY2hhcmxpZQAAAAQAAAAAAAAACn8AACYAAAEfkPtEJgVkZWx0YQAAAAUAAAAAAAAAC38AACcAAAEfkPtEJwRlY2hvAAAABgAAAAAAAAAMfwAAKAAAAR+Q+0QoB2ZveHRyb3QAAAAHAAAAAAAAAA1/AAApAAABH5D7RCkHZ3LDvGV6aQAAAAgAAAAAAAAADn8AACoAAAEfkPtEKgRhbGZhAAAACQAAAAAAAAAPfwAAKwAAAR+Q+0QrBWJyYXZvAAAACgAAAAAAAAAQfwAALAAAAR+Q+0QsB2NoYXJsaWUAAAALAAAAAAAAABF/AAAtAAABH5D7RC0FZGVsdGEAAAAMAAAAAAAAABJ/AAAuAAABH5D7RC4EZWNobwAAAA0AAAAAAAAAE38AAC8AAAEfkPtELwdmb3h0cm90AAAADgAAAAAAAAAUfwAAMAAAAR+Q+0QwB2dyw7xlemkAAAAPAAAAAAAAABV/AAAxAAABH5D7RDEEYWxmYQAAABAAAAAAAAAAFn8AADIAAAEfkPtEMgVicmF2bwAAABEAAAAAAAAAF38AADMAAAEfkPtEMwdjaGFybGllAAAAEgAAAAAAAAAYfwAANAAAAR+Q+0Q0BWRlbHRhAAAAEwAAAAAAAAAZfwAANQAAAR+Q+0Q1BGVjaG8AAAAUAAAAAAAAABp/AAA2AAABH5D7RDYHZm94dHJvdAAAABUAAAAAAAAAAH8AADcAAAEfkPtENwdncsO8ZXppAAAAFgAAAAAAAAABfwAAOAAAAR+Q+0Q4BGFsZmEAAAAXAAAAAAAAAAJ/AAA5AAABH5D7RDkFYnJhdm8AAAAYAAAAAAAAAAN/AAA6AAABH5D7RDoHY2hhcmxpZQAAABkAAAAAAAAABH8AADsAAAEfkPtEOwVkZWx0YQAAABoAAAAAAAAABX8AADwAAAEfkPtEPARlY2hvAAAAGwAAAAAAAAAGfwAAPQAAAR+Q+0Q9B2ZveHRyb3QAAAAcAAAAAAAAAAd/AAA+AAABH5D7RD4HZ3LDvGV6aQAAAB0AAAAAAAAACH8AAD8AAAEfkPtEPwRhbGZhAAAAHgAAAAAAAAAJfwAAQAAAAR+Q+0RABWJyYXZvAAAAHwAAAAAAAAAKfwAAQQAAAR+Q+0RBB2NoYXJsaWUAAAAgAAAAAAAAAAt/AABCAAABH5D7REIFZGVsdGEAAAAAAAAAAAAAAAx/AABDAAABH5D7REMEZWNobwAAAAEAAAAAAAAADX8AAEQAAAEfkPtERAdmb3h0cm90AAAAAgAAAAAAAAAOfwAARQAAAR+Q+0RFB2dyw7xlemkAAAADAAAAAAAAAA9/AABGAAABH5D7REYEYWxmYQAAAAQAAAAAAAAAEH8AAEcAAAEfkPtERwVicmF2bwAAAAUAAAAAAAAAEX8AAEgAAAEfkPtESAdjaGFybGllAAAABgAAAAAAAAASfwAASQAAAR+Q+0RJBWRlbHRhAAAABwAAAAAAAAATfwAASgAAAR+Q+0RKBGVjaG8AAAAIAAAAAAAAABR/AABLAAABH5D7REsHZm94dHJvdAAAAAkAAAAAAAAAFX8AAEwAAAEfkPtETAdncsO8ZXppAAAACgAAAAAAAAAWfwAATQAAAR+Q+0RNBGFsZmEAAAALAAAAAAAAABd/AABOAAABH5D7RE4FYnJhdm8AAAAMAAAAAAAAABh/AABPAAABH5D7RE8HY2hhcmxpZQAAAA0AAAAAAAAAGX8AAFAAAAEfkPtEUAVkZWx0YQAAAA4AAAAAAAAAGn8AAFEAAAEfkPtEUQRlY2hvAAAADwAAAAAAAAAAfwAAUgAAAR+Q+0RSB2ZveHRyb3QAAAAQAAAAAAAAAAF/AABTAAABH5D7RFMHZ3LDvGV6aQAAABEAAAAAAAAAAn8AAFQAAAEfkPtEVARhbGZhAAAAEgAAAAAAAAADfwAAVQAAAR+Q+0RVBWJyYXZvAAAAEwAAAAAAAAAEfwAAVgAAAR+Q+0RWB2NoYXJsaWUAAAAUAAAAAAAAAAV/AABXAAABH5D7RFcFZGVsdGEAAAAVAAAAAAAAAAZ/AABYAAABH5D7RFgEZWNobwAAABYAAAAAAAAAB38AAFkAAAEfkPtEWQdmb3h0cm90AAAAFwAAAAAAAAAIfwAAWgAAAR+Q+0RaB2dyw7xlemkAAAAYAAAAAAAAAAl/AABbAAABH5D7RFsEYWxmYQAAABkAAAAAAAAACn8AAFwAAAEfkPtEXAVicmF2bwAAABoAAAAAAAAAC38AAF0AAAEfkPtEXQdjaGFybGllAAAAGwAAAAAAAAAMfwAAXgAAAR+Q+0ReBWRlbHRhAAAAHAAAAAAAAAANfwAAXwAAAR+Q+0RfBGVjaG8AAAAdAAAAAAAAAA5/AABgAAABH5D7RGAHZm94dHJvdAAAAB4AAAAAAAAAD38AAGEAAAEfkPtEYQdncsO8ZXppAAAAHwAAAAAAAAAQfwAAYgAAAR+Q+0RiBGFsZmEAAAAgAAAAAAAAABF/AABjAAABH5D7RGMFYnJhdm8AAAAAAAAAAAAAABJ/AABkAAABH5D7RGQHY2hhcmxpZQAAAAEAAAAAAAAAE38AAGUAAAEfkPtEZQVkZWx0YQAAAAIAAAAAAAAAFH8AAGYAAAEfkPtEZgRlY2hvAAAAAwAAAAAAAAAVfwAAZwAAAR+Q+0RnB2ZveHRyb3QAAAAEAAAAAAAAABZ/AABoAAABH5D7RGgHZ3LDvGV6aQAAAAUAAAAAAAAAF38AAGkAAAEfkPtEaQRhbGZhAAAABgAAAAAAAAAYfwAAagAAAR+Q+0RqBWJyYXZvAAAABwAAAAAAAAAZfwAAawAAAR+Q+0RrB2NoYXJsaWUAAAAIAAAAAAAAABp/AABsAAABH5D7RGwFZGVsdGEAAAAJAAAAAAAAAAB/AABtAAABH5D7RG0EZWNobwAAAAoAAAAAAAAAAX8AAG4AAAEfkPtEbgdmb3h0cm90AAAACwAAAAAAAAACfwAAbwAAAR+Q+0RvB2dyw7xlemkAAAAMAAAAAAAAAAN/AABwAAABH5D7RHAEYWxmYQAAAA0AAAAAAAAABH8AAHEAAAEfkPtEcQVicmF2bwAAAA4AAAAAAAAABX8AAHIAAAEfkPtEcgdjaGFybGllAAAADwAAAAAAAAAGfwAAcwAAAR+Q+0RzBWRlbHRhAAAAEAAAAAAAAAAHfwAAdAAAAR+Q+0R0BGVjaG8AAAARAAAAAAAAAAh/AAB1AAABH5D7RHUHZm94dHJvdAAAABIAAAAAAAAACX8AAHYAAAEfkPtEdgdncsO8ZXppAAAAEwAAAAAAAAAKfwAAdwAAAR+Q+0R3BGFsZmEAAAAUAAAAAAAAAAt/AAB4AAABH5D7RHgFYnJhdm8AAAAVAAAAAAAAAAx/AAB5AAABH5D7RHkHY2hhcmxpZQAAABYAAAAAAAAADX8AAHoAAAEfkPtEegVkZWx0YQAAABcAAAAAAAAADn8AAHsAAAEfkPtEewRlY2hvAAAAGAAAAAAAAAAPfwAAfAAAAR+Q+0R8B2ZveHRyb3QAAAAZAAAAAAAAABB/AAB9AAABH5D7RH0HZ3LDvGV6aQAAABoAAAAAAAAAEX8AAH4AAAEfkPtEfgRhbGZhAAAAGwAAAAAAAAASfwAAfwAAAR+Q+0R/BWJyYXZvAAAAHAAAAAAAAAAT')
 
@@ -91,6 +93,34 @@ def test_stored_message():
         assert(rec['testString'] == trec['testString'])
         assert(fuzzy_datetime_compare(rec['flowStartMilliseconds'], trec['flowStartMilliseconds']))
 
+def test_message_from_memoryview():
+    buf = bytearray(_stored_test_message)
+    msg = message.MessageBuffer()
+    msg.from_memoryview(memoryview(buf))
+    for i, rec in enumerate(msg.namedict_iterator()):
+        assert(rec['testString'] == mktest_record(i)['testString'])
+    assert(i == 127)
+
+    # the message is decoded in place
+    msg.from_memoryview(memoryview(buf))
+    buf[-12:] = bytearray(12)
+    for rec in msg.namedict_iterator():
+        pass
+    assert(rec['packetDeltaCount'] == 0)
+
+    # and the buffer is back to its own on next read
+    msg.from_bytes(_stored_test_message)
+    buf[0:len(buf)] = bytearray(len(buf))
+    for rec in msg.namedict_iterator():
+        pass
+    assert(rec['packetDeltaCount'] == mktest_record(127)['packetDeltaCount'])
+
+    try:
+        msg.from_memoryview(memoryview(bytearray(_stored_test_message)[0:33]))
+        assert(False)
+    except IpfixDecodeError as e:
+        pass
+
 def test_message_write_internals():
     # make sure EOM works
     try:
@@ -99,6 +129,214 @@ def test_message_write_internals():
     except message.EndOfMessage as m:
         pass
 
+    # make sure EOM works for fixed-length templates, and respects mtu
+    msg = message.MessageBuffer()
+    msg.mtu = 512
+    msg.begin_export(8304)
+    msg.add_template(template.from_ielist(258,
+                     ie.spec_list(["sourceIPv4Address",
+                                   "packetDeltaCount"])))
+    msg.export_ensure_set(258)
+    try:
+        for seq in xrange(512):
+            msg.export_namedict(mktest_record(seq))
+        assert(False)
+    except message.EndOfMessage as m:
+        assert(msg.length <= msg.mtu)
+        assert(msg.length + 12 > msg.mtu)
+
+    # and respects the buffer size when smaller than the mtu
+    msg = message.MessageBuffer(buf_sz=100)
+    msg.begin_export(8304)
+    msg.add_template(template.from_ielist(258,
+                     ie.spec_list(["sourceIPv4Address",
+                                   "packetDeltaCount"])))
+    msg.export_ensure_set(258)
+    try:
+        for seq in xrange(100):
+            msg.export_namedict(mktest_record(seq))
+        assert(False)
+    except message.EndOfMessage as m:
+        assert(msg.length <= 100)
+        assert(msg.length + 12 > 100)
+
+def test_message_sequences():
+    # sequence numbers set by the caller between messages are honored
+    msg = message.MessageBuffer()
+    msg.begin_export(1)
+    msg.add_template(mktest_template())
+    msg.export_ensure_set(257)
+    msg.export_namedict(mktest_record(0))
+    msg.to_bytes()
+    assert(msg.sequences[(1, 0)] == 1)
+    msg.sequences[(1, 0)] = 1000
+    msg.begin_export(1)
+    assert(msg.sequence == 1000)
+
+    # reading counts records into the domain read, and only that domain
+    msg = message.MessageBuffer()
+    msg.from_bytes(_stored_test_message)
+    for rec in msg.namedict_iterator():
+        pass
+    assert(msg.sequences == {(8304, 0): 128})
+    msg.from_bytes(_stored_test_message)
+    for rec in msg.namedict_iterator():
+        pass
+    assert(msg.sequences == {(8304, 0): 256})
+
+def test_message_export_tuples():
+    tmpl = mktest_template()
+    names = [e.name for e in tmpl.ies]
+    recs = [tuple(mktest_record(seq)[name] for name in names)
+            for seq in xrange(256)]
+
+    # export in as many messages as it takes
+    msg = message.MessageBuffer()
+    msg.mtu = 2048
+    msg.begin_export(8304)
+    msg.add_template(tmpl)
+    msgs = []
+    remainder = recs
+    while remainder is not None:
+        msg.export_ensure_set(tmpl.tid)
+        try:
+            msg.export_tuples(remainder)
+            remainder = None
+        except message.EndOfMessage as e:
+            remainder = e.remainder
+        assert(msg.length <= msg.mtu)
+        msgs.append(msg.to_bytes())
+        msg.begin_export()
+    assert(len(msgs) > 1)
+
+    reccount = 0
+    for b in msgs:
+        msg.from_bytes(b)
+        assert(msg.sequence == reccount)
+        for rec in msg.namedict_iterator():
+            trec = mktest_record(reccount)
+            assert(rec['sourceIPv4Address'] == trec['sourceIPv4Address'])
+            assert(rec['testString'] == trec['testString'])
+            assert(rec['packetDeltaCount'] == trec['packetDeltaCount'])
+            reccount += 1
+    assert(reccount == len(recs))
+
+    # bad values in fixed-length records are errors, not a full message
+    msg.begin_export(8304)
+    msg.add_template(template.from_ielist(258,
+                     ie.spec_list(["ingressInterface",
+                                   "packetDeltaCount"])))
+    msg.export_ensure_set(258)
+    length = msg.length
+    try:
+        msg.export_tuples([(1, 1), (2**40, 2), (3, 3)])
+        assert(False)
+    except struct.error:
+        pass
+    assert(msg.length == length + 12)
+
+    # and in the fixed part of variable-length records
+    msg.begin_export(8304)
+    msg.add_template(template.from_ielist(259,
+                     ie.spec_list(["packetDeltaCount",
+                                   "interfaceName"])))
+    msg.export_ensure_set(259)
+    length = msg.length
+    try:
+        msg.export_tuples([(1, "a"), (2**70, "b")])
+        assert(False)
+    except struct.error:
+        pass
+    assert(msg.length == length + 10)
+
+    # while a record running off the end of the buffer still fills it
+    # (here the fixed part of the second record ends at the end of the buffer)
+    msg = message.MessageBuffer(buf_sz=100)
+    msg.begin_export(8304)
+    msg.add_template(template.from_ielist(259,
+                     ie.spec_list(["packetDeltaCount",
+                                   "interfaceName"])))
+    msg.export_ensure_set(259)
+    try:
+        msg.export_tuples([(1, "a" * 47), (2, "b")])
+        assert(False)
+    except message.EndOfMessage as e:
+        assert(msg.length == 92)
+        assert(next(e.remainder) == (2, "b"))
+
+def test_template_compiled_encoders():
+    ie.use_iana_default()
+    for tmpl in (mktest_template(),
+                 template.from_ielist(258,
+                    ie.spec_list(["sourceIPv4Address",
+                                  "flowStartMilliseconds",
+                                  "octetDeltaCount[4]",
+                                  "packetDeltaCount"]))):
+        rec = mktest_record(42)
+        vals = [rec[e.name] for e in tmpl.ies]
+
+        expected = compat.get_buffer(256)
+        explen = tmpl.encode_to(expected, 0, vals)
+
+        tmpl.compile_encoders()
+        for encode_fn, arg in ((tmpl.encode_tuple_to, tuple(vals)),
+                               (tmpl.encode_namedict_to, rec)):
+            buf = compat.get_buffer(256)
+            assert(encode_fn(buf, 0, arg) == explen)
+            assert(buf[0:explen].tobytes() == expected[0:explen].tobytes())
+
+def mktest_raw_record(sequence):
+    rec = mktest_record(sequence)
+    return (int(rec['sourceIPv4Address']),
+            int(types.dt2epoch(rec['flowStartMilliseconds']) * 1000),
+            rec['testString'].encode('utf8'),
+            rec['octetDeltaCount'],
+            rec['packetDeltaCount'])
+
+def test_message_export_tuple_raw():
+    msg = mktest_message()
+    expected = msg.to_bytes()
+
+    msg = message.MessageBuffer()
+    msg.begin_export(8304)
+    msg.add_template(mktest_template())
+    msg.export_ensure_set(257)
+    msg.set_export_time(datetime(2009, 2, 20, 19, 18, 17, tzinfo=None))
+    for seq in xrange(128):
+        msg.export_tuple_raw(mktest_raw_record(seq))
+
+    assert(msg.to_bytes() == expected)
+
+def test_message_buffer_pool():
+    pool = message.MessageBufferPool(2, mtu=1500)
+    msgs = [pool.acquire(), pool.acquire()]
+    assert(msgs[0] is not msgs[1])
+    assert(msgs[0].mtu == 1500)
+    try:
+        pool.acquire(block=False)
+        assert(False)
+    except compat.queue.Empty:
+        pass
+
+    pool.release(msgs[1])
+    assert(pool.acquire(timeout=1) is msgs[1])
+
+    # buffers continue one stream, sharing templates and sequence numbers
+    tmpl = mktest_template()
+    msgs[0].begin_export(8304)
+    msgs[0].add_template(tmpl)
+    msgs[0].export_ensure_set(tmpl.tid)
+    for seq in xrange(3):
+        msgs[0].export_namedict(mktest_record(seq))
+    msgs[0].to_memoryview()
+    msgs[1].begin_export(8304)
+    assert(msgs[1].sequence == 3)
+    msgs[1].export_ensure_set(tmpl.tid)
+    msgs[1].export_namedict(mktest_record(3))
+    msgs[1].to_memoryview()
+    msgs[0].begin_export(8304)
+    assert(msgs[0].sequence == 4)
+
 def test_message_read_internals():
     msg = mktest_message()
 
@@ -106,6 +344,89 @@ def test_message_read_internals():
     assert(fuzzy_datetime_compare(msg.get_export_time(), datetime(2009, 2, 20, 19, 18, 17, tzinfo=None)))
 
 
+def test_fixed_template_decode():
+    ie.use_iana_default()
+    tmpl = template.from_ielist(258,
+           ie.spec_list(["sourceIPv4Address",
+                         "flowStartMilliseconds",
+                         "octetDeltaCount[4]",
+                         "packetDeltaCount"]))
+
+    msg = message.MessageBuffer()
+    msg.begin_export(8304)
+    msg.add_template(tmpl)
+    msg.export_ensure_set(258)
+    for seq in xrange(32):
+        msg.export_namedict(mktest_record(seq))
+
+    # pad the set with a few bytes shorter than a record
+    msg.length += 3
+    msg.from_bytes(msg.to_bytes())
+
+    for i, rec in enumerate(msg.namedict_iterator()):
+        trec = mktest_record(i)
+        assert(rec['packetDeltaCount'] == trec['packetDeltaCount'])
+        assert(rec['octetDeltaCount'] == trec['octetDeltaCount'])
+        assert(rec['sourceIPv4Address'] == trec['sourceIPv4Address'])
+        assert(fuzzy_datetime_compare(rec['flowStartMilliseconds'], trec['flowStartMilliseconds']))
+    assert(i == 31)
+
+    ielist = ie.spec_list(["packetDeltaCount", "sourceIPv4Address"])
+    for i, rec in enumerate(msg.tuple_iterator(ielist)):
+        trec = mktest_record(i)
+        assert(rec == (trec['packetDeltaCount'], trec['sourceIPv4Address']))
+    assert(i == 31)
+
+    # reduced-length IEs match their full-length counterparts
+    ielist = ie.spec_list(["sourceIPv4Address", "octetDeltaCount"])
+    recs = list(msg.tuple_iterator(ielist))
+    assert(len(recs) == 32)
+    for i, rec in enumerate(recs):
+        trec = mktest_record(i)
+        assert(rec == (trec['sourceIPv4Address'], trec['octetDeltaCount']))
+
+def test_message_read_into():
+    (wsock, rsock) = socket.socketpair()
+    try:
+        wsock.sendall(_stored_test_message)
+        wsock.sendall(_stored_test_message[0:33])
+        wsock.close()
+
+        msg = message.MessageBuffer()
+        msg.read_message_into(rsock)
+        for i, rec in enumerate(msg.namedict_iterator()):
+            assert(rec['testString'] == mktest_record(i)['testString'])
+        assert(i == 127)
+
+        try:
+            msg.read_message_into(rsock)
+            assert(False)
+        except IpfixDecodeError as e:
+            pass
+
+        try:
+            msg.read_message_into(rsock)
+            assert(False)
+        except EOFError as e:
+            pass
+    finally:
+        rsock.close()
+
+    # messages larger than the buffer are rejected before reading the body
+    (wsock, rsock) = socket.socketpair()
+    try:
+        wsock.sendall(_stored_test_message)
+        wsock.close()
+
+        msg = message.MessageBuffer(buf_sz=100)
+        try:
+            msg.read_message_into(rsock)
+            assert(False)
+        except IpfixDecodeError as e:
+            assert("exceeds buffer size" in str(e))
+    finally:
+        rsock.close()
+
 def test_message_read_errors():
     short_read_test_message_hdr = bytearray(_stored_test_message)
     short_read_test_message_hdr = short_read_test_message_hdr[0:12]
@@ -30,7 +30,6 @@ from .template import IpfixEncodeError, IpfixDecodeError
 from .message import accept_all_templates
 from .compat import ifilter
 
-import operator
 import struct
 from warnings import warn
 
@@ -67,6 +66,9 @@ class PduBuffer(object):
 
         self.last_tuple_iterator_ielist = None
 
+        # illegal set IDs already warned about
+        self._warned_illegal_setids = set()
+
         self.template_record_hook = None
         self.unknown_data_set_hook = None
         self.ignored_data_set_hook = None
@@ -151,7 +153,9 @@ class PduBuffer(object):
                         self.template_record_hook(self, tmpl)
 
             elif setid < 256:
-                warn("skipping illegal set id "+str(setid))
+                if setid not in self._warned_illegal_setids:
+                    self._warned_illegal_setids.add(setid)
+                    warn("skipping illegal set id "+str(setid))
 
             else:
                 try:
@@ -215,9 +219,10 @@ class PduBuffer(object):
 
         """
 
-        tmplaccept_fn = lambda tmpl: \
-                reduce(operator.__and__,
-                                 (ie in tmpl.ies for ie in ielist))
+        ielist_keys = tuple((ie.pen, ie.num) for ie in ielist)
+        def tmplaccept_fn(tmpl):
+            ie_keys = tmpl._ie_keys
+            return all(key in ie_keys for key in ielist_keys)
 
         if ((not self.last_tuple_iterator_ielist) or
             (ielist is not self.last_tuple_iterator_ielist)):
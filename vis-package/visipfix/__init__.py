@@ -436,7 +436,7 @@ class MessageBufferRenderer(object):
 
             else:
                 try:
-                    tmpl = self.msg.templates[(self.msg.odid, setid)]
+                    tmpl = self.msg.templates[self.msg.odid][setid]
                     while (offset + tmpl.minlength <= setend) and\
                           (offset < start + length):
                         fill = self.record_fill[reccount % len(self.record_fill)]